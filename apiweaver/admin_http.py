@@ -9,28 +9,83 @@ Routes (server-scoped):
 - GET  /admin/{server_name}/schema/{api_name} -> get schema, optional ?endpoint=xxx
 
 Behavior:
-- Persist configs into single apis.json organized by server name (see storage.JsonStore).
+- Persist configs into single apis.json organized by server name (see storage.JsonStore);
+  written compactly, set APIWEAVER_STORE_PRETTY=1 for an indented file and
+  APIWEAVER_STORE_DURABLE=1 to fsync every change.
 - On FastAPI startup loads all servers and registers their APIs into per-server APIWeaver instances.
 - Each server gets its own APIWeaver instance stored in `weavers` dict.
+- All weavers share one pooled HTTP transport (app.state.http) owned by the app lifespan;
+  aiohttp by default, httpx with APIWEAVER_HTTP_BACKEND=httpx (see transport.py).
 - Note: running multiple MCP transports (HTTP ports) from same process requires configuring each APIWeaver.run(...) appropriately
 """
-from typing import Optional, Dict, Any
+from contextlib import asynccontextmanager
+from typing import Optional, Dict, Any, Tuple
 import asyncio
+import functools
+import hashlib
+import os
+import time
 
-from fastapi import FastAPI, HTTPException, Body
+from fastapi import FastAPI, HTTPException, Response
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from pydantic import BaseModel
-import uvicorn
+import orjson
 
 from .storage import JsonStore
-from .server import APIWeaver
+from .server import APIWeaver, AuthContext
+from .transport import create_transport
 from .models import APIConfig  # reuse repo models
 
-app = FastAPI(title="APIWeaver Admin (multi-server)", version="0.1.0")
-store = JsonStore("apis.json")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Own the process-wide HTTP transport: one connection pool shared by every
+    weaver, so TLS sessions and keep-alive connections are reused across APIs.
+    """
+    app.state.http = create_transport(timeout=10.0)
+    # Bounds concurrent /test probes so polling clients cannot exhaust the pool;
+    # created here because a semaphore binds to the loop that first waits on it.
+    app.state.probe_sem = asyncio.Semaphore(32)
+    # Weavers outlive a lifespan (e.g. repeated TestClient use); move any left
+    # from a previous one off its closed transport.
+    for weaver in weavers.values():
+        weaver.http_client = app.state.http
+    store.start()
+    try:
+        await startup_event()
+        yield
+    finally:
+        await shutdown_event()
+        await app.state.http.aclose()
+
+app = FastAPI(
+    title="APIWeaver Admin (multi-server)",
+    version="0.1.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
+)
+store = JsonStore(
+    "apis.json",
+    pretty=os.environ.get("APIWEAVER_STORE_PRETTY") == "1",
+    durable=os.environ.get("APIWEAVER_STORE_DURABLE") == "1",
+)
 
 # Map server_name -> APIWeaver instance
 weavers: Dict[str, APIWeaver] = {}
-_startup_lock = asyncio.Lock()
+
+# Validated configs keyed by a digest of their canonical JSON, so identical
+# configs (restarts, the same API on several servers) are validated once.
+_config_cache: Dict[bytes, APIConfig] = {}
+_CONFIG_CACHE_MAX = 256
+
+# Marks persisted configs that are dumps of validated APIConfig objects; those
+# are rebuilt without re-validation on startup.
+_TRUSTED_KEY = "_trusted"
+
+# Recent connection-test results keyed by (base_url, auth headers)
+_probe_cache: Dict[Any, Tuple[float, Dict[str, Any]]] = {}
+_PROBE_TTL = 5.0
+_PROBE_CACHE_MAX = 256
 
 # Request models
 class RegisterPayload(BaseModel):
@@ -42,6 +97,22 @@ class UnregisterPayload(BaseModel):
 class TestPayload(BaseModel):
     api_name: str
 
+def _parse_config(cfg: Dict[str, Any], trusted: bool = False) -> APIConfig:
+    """
+    Validate cfg into an APIConfig, reusing the result for identical configs.
+    Only configs read back from our own store may be passed with trusted=True.
+    """
+    if trusted and cfg.get(_TRUSTED_KEY):
+        return APIConfig.from_trusted({k: v for k, v in cfg.items() if k != _TRUSTED_KEY})
+    key = hashlib.blake2b(orjson.dumps(cfg, option=orjson.OPT_SORT_KEYS)).digest()
+    api_config = _config_cache.get(key)
+    if api_config is None:
+        api_config = APIConfig(**cfg)
+        if len(_config_cache) >= _CONFIG_CACHE_MAX:
+            _config_cache.pop(next(iter(_config_cache)))
+        _config_cache[key] = api_config
+    return api_config
+
 async def _ensure_weaver_for(server_name: str) -> APIWeaver:
     """
     Ensure an APIWeaver instance exists for server_name.
@@ -50,35 +121,74 @@ async def _ensure_weaver_for(server_name: str) -> APIWeaver:
     """
     if server_name in weavers:
         return weavers[server_name]
-    # Create new APIWeaver instance with a unique name
-    weaver = APIWeaver(name=f"APIWeaver-{server_name}")
+    # Create new APIWeaver instance with a unique name, sharing the app-wide transport
+    weaver = APIWeaver(
+        name=f"APIWeaver-{server_name}",
+        http_client=app.state.http,
+        on_change=functools.partial(_persist_change, server_name),
+    )
     weavers[server_name] = weaver
     return weaver
 
-@app.on_event("startup")
+async def _persist_change(server_name: str, api_name: str, api_config: Optional[APIConfig]):
+    """Write through APIs (un)registered with a weaver's own MCP tools."""
+    _resolve.cache_clear()
+    if api_config is None:
+        await store.remove_api(server_name, api_name)
+    else:
+        await store.add_api(server_name, api_name, {**api_config.as_dict(), _TRUSTED_KEY: True})
+
+@functools.lru_cache(maxsize=4096)
+def _resolve(server_name: str, api_name: str) -> Tuple[APIWeaver, APIConfig, AuthContext]:
+    """
+    Look up the weaver, config and auth context of a registered API, or raise 404.
+    Only hits are cached (exceptions are not), so every change to a weaver's
+    apis (admin routes, startup, the weavers' MCP tools via _persist_change)
+    must call _resolve.cache_clear().
+    """
+    weaver = weavers.get(server_name)
+    api_config = weaver.apis.get(api_name) if weaver else None
+    auth_ctx = weaver.auth_contexts.get(api_name) if api_config else None
+    if not auth_ctx:
+        raise HTTPException(status_code=404, detail=f"API '{api_name}' not found on server '{server_name}'")
+    return weaver, api_config, auth_ctx
+
+def _probe_key(api_config: APIConfig, auth_ctx: AuthContext) -> Tuple[Any, ...]:
+    return (api_config.base_url, tuple(sorted(auth_ctx.headers.items())))
+
+async def _load_api(weaver: APIWeaver, cfg: Dict[str, Any]):
+    """Register one persisted API config into weaver."""
+    api_config = _parse_config(cfg, trusted=True)
+    weaver.apis[api_config.name] = api_config
+    weaver.auth_contexts[api_config.name] = weaver._create_auth_context(api_config)
+    await asyncio.gather(*(
+        weaver._create_endpoint_tool(api_config, ep, f"{api_config.name}_{ep.name}")
+        for ep in api_config.endpoints
+    ))
+    weaver._rebuild_schema_cache(api_config.name)
+
 async def startup_event():
     """
     Load persisted configs from apis.json and register them into per-server weavers.
+    All APIs of all servers load concurrently; a failing API is logged and skipped.
     """
-    async with _startup_lock:
-        all_servers = await store.load_all_servers()
-        for server_name, apis in all_servers.items():
-            try:
-                weaver = await _ensure_weaver_for(server_name)
-                # register each api in that server
-                for name, cfg in apis.items():
-                    try:
-                        api_config = APIConfig(**cfg)
-                        weaver.apis[api_config.name] = api_config
-                        client = await weaver._create_http_client(api_config)
-                        weaver.http_clients[api_config.name] = client
-                        for ep in api_config.endpoints:
-                            tool_name = f"{api_config.name}_{ep.name}"
-                            await weaver._create_endpoint_tool(api_config, ep, tool_name)
-                    except Exception as e:
-                        print(f"[admin startup] server={server_name} failed to load api={name}: {e}")
-            except Exception as e:
-                print(f"[admin startup] failed to init weaver for server={server_name}: {e}")
+    all_servers = await store.load_all_servers()
+    jobs = []
+    for server_name, apis in all_servers.items():
+        try:
+            weaver = await _ensure_weaver_for(server_name)
+        except Exception as e:
+            print(f"[admin startup] failed to init weaver for server={server_name}: {e}")
+            continue
+        jobs.extend((server_name, name, _load_api(weaver, cfg)) for name, cfg in apis.items())
+
+    results = await asyncio.gather(*(job for _, _, job in jobs), return_exceptions=True)
+    for (server_name, name, _), result in zip(jobs, results, strict=True):
+        if isinstance(result, Exception):
+            print(f"[admin startup] server={server_name} failed to load api={name}: {result}")
+    for weaver in weavers.values():
+        weaver._rebuild_list_cache()
+    _resolve.cache_clear()
 
 @app.post("/admin/{server_name}/register")
 async def admin_register(server_name: str, payload: RegisterPayload):
@@ -88,7 +198,7 @@ async def admin_register(server_name: str, payload: RegisterPayload):
     """
     config = payload.config
     try:
-        api_config = APIConfig(**config)
+        api_config = _parse_config(config)
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Invalid config: {e}")
 
@@ -98,39 +208,37 @@ async def admin_register(server_name: str, payload: RegisterPayload):
     if name in weaver.apis:
         raise HTTPException(status_code=400, detail=f"API '{name}' already registered on server '{server_name}'")
 
+    # Claim the name before the first await so a concurrent register fails fast
+    weaver.apis[name] = api_config
+    weaver.auth_contexts[name] = weaver._create_auth_context(api_config)
+    created = [f"{name}_{ep.name}" for ep in api_config.endpoints]
+
     try:
-        # Create client and tools (same logic as register_api)
-        weaver.apis[name] = api_config
-        client = await weaver._create_http_client(api_config)
-        weaver.http_clients[name] = client
-
-        created = []
-        for ep in api_config.endpoints:
-            tool_name = f"{name}_{ep.name}"
+        for ep, tool_name in zip(api_config.endpoints, created, strict=True):
             await weaver._create_endpoint_tool(api_config, ep, tool_name)
-            created.append(tool_name)
-
-        # persist under server
-        await store.add_api(server_name, name, config)
-
-        return {"status": "ok", "message": f"Registered {name} on server {server_name}", "created_tools": created}
+        # Persist only once the tools exist, so a failed register never touches
+        # a stored entry it did not write (e.g. one that failed to load at startup)
+        await _persist_change(server_name, name, api_config)
     except Exception as e:
-        # Cleanup on failure
-        if name in weaver.http_clients:
-            await weaver.http_clients[name].aclose()
-            del weaver.http_clients[name]
-        if name in weaver.apis:
-            del weaver.apis[name]
+        for tool_name in created:
+            try:
+                weaver.mcp.remove_tool(tool_name)
+            except Exception:
+                pass
+        weaver.auth_contexts.pop(name, None)
+        weaver.apis.pop(name, None)
+        _resolve.cache_clear()
         raise HTTPException(status_code=500, detail=str(e))
 
+    weaver._rebuild_schema_cache(name)
+    weaver._rebuild_list_cache(name)
+    return {"status": "ok", "message": f"Registered {name} on server {server_name}", "created_tools": created}
+
 @app.post("/admin/{server_name}/unregister")
 async def admin_unregister(server_name: str, payload: UnregisterPayload):
     name = payload.api_name
-    weaver = weavers.get(server_name)
-    if not weaver or name not in weaver.apis:
-        raise HTTPException(status_code=404, detail=f"API '{name}' not found on server '{server_name}'")
-
-    api_config = weaver.apis[name]
+    weaver, api_config, auth_ctx = _resolve(server_name, name)
+    _probe_cache.pop(_probe_key(api_config, auth_ctx), None)
     # Remove tools
     for ep in api_config.endpoints:
         tool_name = f"{name}_{ep.name}"
@@ -138,15 +246,13 @@ async def admin_unregister(server_name: str, payload: UnregisterPayload):
             weaver.mcp.remove_tool(tool_name)
         except Exception:
             pass
-    # Close http client
-    if name in weaver.http_clients:
-        try:
-            await weaver.http_clients[name].aclose()
-        except Exception:
-            pass
-        del weaver.http_clients[name]
+    # Drop request state (the shared transport stays open)
+    weaver.auth_contexts.pop(name, None)
     # Remove config
     del weaver.apis[name]
+    _resolve.cache_clear()
+    weaver._rebuild_schema_cache(name)
+    weaver._rebuild_list_cache(name)
     # Persist removal
     await store.remove_api(server_name, name)
     return {"status": "ok", "message": f"Unregistered {name} from server {server_name}"}
@@ -155,145 +261,65 @@ async def admin_unregister(server_name: str, payload: UnregisterPayload):
 async def admin_list(server_name: str):
     """
     Return all registered APIs for the given server (similar to list_apis tool).
+    Streamed API by API from the weaver's pre-serialized entries, which are
+    rebuilt on register/unregister, so the full body is never materialized.
     """
     weaver = weavers.get(server_name)
     if not weaver:
         return {}  # empty server
-    result = {}
-    for name, api in weaver.apis.items():
-        result[name] = {
-            "base_url": api.base_url,
-            "description": api.description,
-            "auth_type": api.auth.type if api.auth else "none",
-            "endpoints": [
-                {
-                    "name": ep.name,
-                    "method": ep.method,
-                    "path": ep.path,
-                    "description": ep.description,
-                    "parameters": [
-                        {
-                            "name": param.name,
-                            "type": param.type,
-                            "location": param.location,
-                            "required": param.required,
-                            "description": param.description,
-                            "default": param.default
-                        }
-                        for param in ep.params
-                    ]
-                }
-                for ep in api.endpoints
-            ]
-        }
-    return result
+    entries = list(weaver._list_entries.values())
+
+    async def _stream():
+        yield b"{"
+        for i, entry in enumerate(entries):
+            yield b"," + entry if i else entry
+        yield b"}"
+
+    return StreamingResponse(_stream(), media_type="application/json")
 
 @app.post("/admin/{server_name}/test")
 async def admin_test(server_name: str, payload: TestPayload):
-    name = payload.api_name
-    weaver = weavers.get(server_name)
-    if not weaver or name not in weaver.apis:
-        raise HTTPException(status_code=404, detail=f"API '{name}' not found on server '{server_name}'")
-    client = weaver.http_clients.get(name)
-    if not client:
-        raise HTTPException(status_code=500, detail=f"No HTTP client for '{name}'")
-    api_config = weaver.apis[name]
+    _, api_config, auth_ctx = _resolve(server_name, payload.api_name)
+    key = _probe_key(api_config, auth_ctx)
+    now = time.monotonic()
+    cached = _probe_cache.get(key)
+    if cached and now - cached[0] < _PROBE_TTL:
+        return cached[1]
     try:
-        resp = await client.head(api_config.base_url, timeout=5.0)
-        return {"status": "connected", "status_code": resp.status_code, "headers": dict(resp.headers)}
+        async with app.state.probe_sem:
+            resp = await app.state.http.head(api_config.base_url, headers=auth_ctx.headers, timeout=5.0)
+        result = {"status": "connected", "status_code": resp.status_code, "headers": resp.headers}
     except Exception as e:
-        return {"status": "failed", "error": str(e)}
+        result = {"status": "failed", "error": str(e)}
+    if key not in _probe_cache and len(_probe_cache) >= _PROBE_CACHE_MAX:
+        _probe_cache.pop(next(iter(_probe_cache)))
+    _probe_cache[key] = (now, result)
+    return result
 
 @app.get("/admin/{server_name}/schema/{api_name}")
 async def admin_schema(server_name: str, api_name: str, endpoint: Optional[str] = None):
-    weaver = weavers.get(server_name)
-    if not weaver or api_name not in weaver.apis:
-        raise HTTPException(status_code=404, detail=f"API '{api_name}' not found on server '{server_name}'")
-    api_config = weaver.apis[api_name]
+    weaver, _, _ = _resolve(server_name, api_name)
+    if api_name not in weaver._schema_cache:
+        # e.g. an API whose tools failed to load at startup
+        weaver._rebuild_schema_cache(api_name)
     if endpoint:
-        ep = next((e for e in api_config.endpoints if e.name == endpoint), None)
-        if not ep:
+        content = weaver._endpoint_schema_cache.get(api_name, {}).get(endpoint)
+        if content is None:
             raise HTTPException(status_code=404, detail=f"Endpoint '{endpoint}' not found in API '{api_name}'")
-        return {
-            "api_name": api_name,
-            "endpoint_name": endpoint,
-            "method": ep.method,
-            "path": ep.path,
-            "description": ep.description,
-            "parameters": [
-                {
-                    "name": p.name,
-                    "type": p.type,
-                    "location": p.location,
-                    "required": p.required,
-                    "description": p.description,
-                    "default": p.default,
-                    "enum": p.enum
-                } for p in ep.params
-            ],
-            "headers": ep.headers,
-            "timeout": ep.timeout
-        }
     else:
-        return {
-            "api_name": api_name,
-            "base_url": api_config.base_url,
-            "description": api_config.description,
-            "auth_type": api_config.auth.type if api_config.auth else "none",
-            "global_headers": api_config.headers,
-            "endpoints": [
-                {
-                    "name": ep.name,
-                    "method": ep.method,
-                    "path": ep.path,
-                    "description": ep.description,
-                    "parameters": [
-                        {
-                            "name": p.name,
-                            "type": p.type,
-                            "location": p.location,
-                            "required": p.required,
-                            "description": p.description,
-                            "default": p.default,
-                            "enum": p.enum
-                        } for p in ep.params
-                    ]
-                } for ep in api_config.endpoints
-            ]
-        }
-
-@app.on_event("shutdown")
+        content = weaver._schema_cache[api_name]
+    return Response(content=content, media_type="application/json")
+
 async def shutdown_event():
-    # Persist current configs on shutdown (defensive)
+    # Every register/unregister (admin routes and, via on_change, the weavers' MCP
+    # tools) is already logged by the store; shutdown only needs a final compaction.
     try:
-        to_save = {}
-        for server_name, weaver in weavers.items():
-            server_cfg = {}
-            for name, api in weaver.apis.items():
-                try:
-                    cfg = api.dict()
-                except Exception:
-                    cfg = {
-                        "name": api.name,
-                        "base_url": api.base_url,
-                        "description": getattr(api, "description", None),
-                        "auth": getattr(api, "auth", None),
-                        "headers": getattr(api, "headers", None),
-                        "endpoints": [ep.dict() if hasattr(ep, "dict") else ep for ep in api.endpoints]
-                    }
-                server_cfg[name] = cfg
-            to_save[server_name] = server_cfg
-        await store.save_server("__all__", {})  # noop ensure file exists (not required)
-        # write whole structure
-        # Use store._write_file directly under lock to replace full file
-        async with store._lock:
-            all_existing = await store._read_file()
-            # merge with others if present
-            all_existing.update(to_save)
-            await store._write_file(all_existing)
+        await store.aclose()
     except Exception as e:
-        print(f"[admin shutdown] failed to save configs: {e}")
+        print(f"[admin shutdown] failed to flush store: {e}")
 
 # Run admin server standalone:
 if __name__ == "__main__":
+    import uvicorn
+
     uvicorn.run("apiweaver.admin_http:app", host="127.0.0.1", port=9000, reload=False)
@@ -3,7 +3,7 @@ Data models for APIWeaver.
 """
 
 from typing import Dict, Any, Optional, List
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict, PrivateAttr
 
 
 class AuthConfig(BaseModel):
@@ -56,3 +56,42 @@ class APIConfig(BaseModel):
     auth: Optional[AuthConfig] = Field(None, description="Authentication configuration")
     headers: Optional[Dict[str, str]] = Field(None, description="Global headers for all requests")
     endpoints: List[APIEndpoint] = Field(..., description="List of API endpoints")
+
+    _cached_dict: Optional[Dict[str, Any]] = PrivateAttr(default=None)
+    _endpoint_index: Optional[Dict[str, APIEndpoint]] = PrivateAttr(default=None)
+
+    def get_endpoint(self, name: str) -> Optional[APIEndpoint]:
+        """Look up an endpoint by name via an index built on first use."""
+        if self._endpoint_index is None:
+            self._endpoint_index = {ep.name: ep for ep in self.endpoints}
+        return self._endpoint_index.get(name)
+
+    @classmethod
+    def from_trusted(cls, data: Dict[str, Any]) -> "APIConfig":
+        """
+        Build an APIConfig from a dump of an already-validated config, skipping validation.
+
+        model_construct() does not recurse, so nested models are constructed explicitly.
+        """
+        data = dict(data)
+        if data.get("auth") is not None:
+            data["auth"] = AuthConfig.model_construct(**data["auth"])
+        data["endpoints"] = [
+            APIEndpoint.model_construct(**{
+                **ep,
+                "params": [RequestParam.model_construct(**param) for param in ep.get("params") or []]
+            })
+            for ep in data.get("endpoints") or []
+        ]
+        return cls.model_construct(**data)
+
+    def as_dict(self) -> Dict[str, Any]:
+        """
+        Return model_dump(), computed once per instance.
+
+        Configs are treated as immutable once registered; reset _cached_dict
+        if a config is ever modified in place.
+        """
+        if self._cached_dict is None:
+            self._cached_dict = self.model_dump()
+        return self._cached_dict
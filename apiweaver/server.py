@@ -7,26 +7,81 @@ into MCP (Model Context Protocol) tools.
 
 import json
 import asyncio
+import base64
 import inspect
-from typing import Dict, Any, Optional, List, Union
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, Any, Optional, List, Union
 from urllib.parse import urljoin, quote
-import httpx
 import os
 # Set required environment variable for FastMCP 2.8.1+
 os.environ.setdefault('FASTMCP_LOG_LEVEL', 'INFO')
+import orjson
 from fastmcp import FastMCP, Context
 from .models import APIConfig, APIEndpoint, AuthConfig, RequestParam
+from .transport import HTTPStatusError, Transport, create_transport
+
+
+@dataclass
+class AuthContext:
+    """
+    Per-API request state applied on top of the shared HTTP transport.
+
+    Everything that does not depend on call arguments is resolved once at
+    registration: auth and global headers, API-key query params, and each
+    endpoint's final header set (endpoint_headers, keyed by endpoint name).
+    """
+    base_url: str
+    headers: Dict[str, str] = field(default_factory=dict)
+    params: Dict[str, Any] = field(default_factory=dict)
+    endpoint_headers: Dict[str, Dict[str, str]] = field(default_factory=dict)
+    url_prefix: str = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self.url_prefix = self.base_url.rstrip("/")
+
+    def url_for(self, path: str) -> str:
+        """Join an endpoint path onto the API base URL."""
+        return f"{self.url_prefix}/{path.lstrip('/')}"
 
 
 class APIWeaver:
     """Main server that creates MCP tools from API configurations."""
     
-    def __init__(self, name: str = "APIWeaver"):
+    def __init__(
+        self,
+        name: str = "APIWeaver",
+        http_client: Optional[Transport] = None,
+        on_change: Optional[Callable[[str, Optional[APIConfig]], Awaitable[None]]] = None,
+    ):
         self.mcp = FastMCP(name)
         self.apis: Dict[str, APIConfig] = {}
-        self.http_clients: Dict[str, httpx.AsyncClient] = {}
+        self.auth_contexts: Dict[str, AuthContext] = {}
+        # Awaited as on_change(api_name, config) after the register_api/unregister_api
+        # tools change apis (config is None on removal), e.g. to persist the change.
+        self.on_change = on_change
+        # A transport injected by the host is shared (and closed) by the host;
+        # otherwise one is created lazily and owned by this instance.
+        self.http_client = http_client
+        self._owns_http_client = http_client is None
+        # Pre-serialized list/schema responses, rebuilt whenever apis change.
+        # List entries are '"name":{...}' fragments, one per API.
+        self._list_entries: Dict[str, bytes] = {}
+        self._schema_cache: Dict[str, bytes] = {}
+        self._endpoint_schema_cache: Dict[str, Dict[str, bytes]] = {}
         self._setup_core_tools()
     
+    def _get_http_client(self) -> Transport:
+        """Return the shared HTTP transport, creating it on first use."""
+        if self.http_client is None:
+            self.http_client = create_transport()
+        return self.http_client
+    
+    async def aclose(self):
+        """Close the HTTP transport if it is owned by this instance."""
+        if self._owns_http_client and self.http_client is not None:
+            await self.http_client.aclose()
+            self.http_client = None
+    
     def _setup_core_tools(self):
         """Set up the core management tools."""
         
@@ -53,9 +108,8 @@ class APIWeaver:
                 # Store API configuration
                 self.apis[api_config.name] = api_config
                 
-                # Create HTTP client for this API
-                client = await self._create_http_client(api_config)
-                self.http_clients[api_config.name] = client
+                # Resolve auth and headers for this API
+                self.auth_contexts[api_config.name] = self._create_auth_context(api_config)
                 
                 # Create tools for each endpoint
                 created_tools = []
@@ -68,6 +122,11 @@ class APIWeaver:
                         await ctx.error(f"Failed to create tool {tool_name}: {str(e)}")
                         continue
                 
+                self._rebuild_schema_cache(api_config.name)
+                self._rebuild_list_cache(api_config.name)
+                if self.on_change:
+                    await self.on_change(api_config.name, api_config)
+                
                 await ctx.info(f"Registered API '{api_config.name}' with {len(created_tools)} tools")
                 return f"Successfully registered API '{api_config.name}' with tools: {', '.join(created_tools)}"
                 
@@ -83,34 +142,7 @@ class APIWeaver:
             Returns:
                 Dictionary of registered APIs with their configurations
             """
-            result = {}
-            for name, api in self.apis.items():
-                result[name] = {
-                    "base_url": api.base_url,
-                    "description": api.description,
-                    "auth_type": api.auth.type if api.auth else "none",
-                    "endpoints": [
-                        {
-                            "name": ep.name,
-                            "method": ep.method,
-                            "path": ep.path,
-                            "description": ep.description,
-                            "parameters": [
-                                {
-                                    "name": param.name,
-                                    "type": param.type,
-                                    "location": param.location,
-                                    "required": param.required,
-                                    "description": param.description,
-                                    "default": param.default
-                                }
-                                for param in ep.params
-                            ]
-                        }
-                        for ep in api.endpoints
-                    ]
-                }
-            return result
+            return {name: self._api_summary(api) for name, api in self.apis.items()}
         
         @self.mcp.tool()
         async def unregister_api(api_name: str, ctx: Context) -> str:
@@ -136,13 +168,15 @@ class APIWeaver:
                 except:
                     pass  # Tool might not exist
             
-            # Close HTTP client
-            if api_name in self.http_clients:
-                await self.http_clients[api_name].aclose()
-                del self.http_clients[api_name]
+            # Drop request state
+            self.auth_contexts.pop(api_name, None)
             
             # Remove API config
             del self.apis[api_name]
+            self._rebuild_schema_cache(api_name)
+            self._rebuild_list_cache(api_name)
+            if self.on_change:
+                await self.on_change(api_name, None)
             
             await ctx.info(f"Unregistered API '{api_name}'")
             return f"Successfully unregistered API '{api_name}'"
@@ -162,14 +196,16 @@ class APIWeaver:
                 raise ValueError(f"API '{api_name}' not found")
             
             api_config = self.apis[api_name]
-            client = self.http_clients.get(api_name)
+            auth_ctx = self.auth_contexts.get(api_name)
             
-            if not client:
-                raise ValueError(f"No HTTP client found for API '{api_name}'")
+            if not auth_ctx:
+                raise ValueError(f"No auth context found for API '{api_name}'")
             
             try:
                 # Try a simple HEAD or GET request to base URL
-                response = await client.head(api_config.base_url, timeout=5.0)
+                response = await self._get_http_client().head(
+                    api_config.base_url, headers=auth_ctx.headers, timeout=5.0
+                )
                 return {
                     "status": "connected",
                     "status_code": response.status_code,
@@ -232,11 +268,7 @@ class APIWeaver:
             
             # Find the endpoint
             api_config = self.apis[api_name]
-            endpoint = None
-            for ep in api_config.endpoints:
-                if ep.name == endpoint_name:
-                    endpoint = ep
-                    break
+            endpoint = api_config.get_endpoint(endpoint_name)
             
             if not endpoint:
                 available_endpoints = [ep.name for ep in api_config.endpoints]
@@ -318,11 +350,7 @@ class APIWeaver:
             
             if endpoint_name:
                 # Return specific endpoint schema
-                endpoint = None
-                for ep in api_config.endpoints:
-                    if ep.name == endpoint_name:
-                        endpoint = ep
-                        break
+                endpoint = api_config.get_endpoint(endpoint_name)
                 
                 if not endpoint:
                     available_endpoints = [ep.name for ep in api_config.endpoints]
@@ -331,62 +359,106 @@ class APIWeaver:
                         await ctx.error(error_msg)
                     raise ValueError(error_msg)
                 
-                return {
-                    "api_name": api_name,
-                    "endpoint_name": endpoint_name,
-                    "method": endpoint.method,
-                    "path": endpoint.path,
-                    "description": endpoint.description,
-                    "parameters": [
-                        {
-                            "name": param.name,
-                            "type": param.type,
-                            "location": param.location,
-                            "required": param.required,
-                            "description": param.description,
-                            "default": param.default,
-                            "enum": param.enum
-                        }
-                        for param in endpoint.params
-                    ],
-                    "headers": endpoint.headers,
-                    "timeout": endpoint.timeout
-                }
+                return self._endpoint_schema(api_config, endpoint)
             else:
                 # Return all endpoints schema
-                return {
-                    "api_name": api_name,
-                    "base_url": api_config.base_url,
-                    "description": api_config.description,
-                    "auth_type": api_config.auth.type if api_config.auth else "none",
-                    "global_headers": api_config.headers,
-                    "endpoints": [
-                        {
-                            "name": ep.name,
-                            "method": ep.method,
-                            "path": ep.path,
-                            "description": ep.description,
-                            "parameters": [
-                                {
-                                    "name": param.name,
-                                    "type": param.type,
-                                    "location": param.location,
-                                    "required": param.required,
-                                    "description": param.description,
-                                    "default": param.default,
-                                    "enum": param.enum
-                                }
-                                for param in ep.params
-                            ]
-                        }
-                        for ep in api_config.endpoints
-                    ]
+                return self._api_schema(api_config)
+    
+    @staticmethod
+    def _param_schema(param: RequestParam, with_enum: bool = True) -> Dict[str, Any]:
+        schema = {
+            "name": param.name,
+            "type": param.type,
+            "location": param.location,
+            "required": param.required,
+            "description": param.description,
+            "default": param.default
+        }
+        if with_enum:
+            schema["enum"] = param.enum
+        return schema
+    
+    def _api_summary(self, api: APIConfig) -> Dict[str, Any]:
+        """Entry for one API in the list_apis response."""
+        return {
+            "base_url": api.base_url,
+            "description": api.description,
+            "auth_type": api.auth.type if api.auth else "none",
+            "endpoints": [
+                {
+                    "name": ep.name,
+                    "method": ep.method,
+                    "path": ep.path,
+                    "description": ep.description,
+                    "parameters": [self._param_schema(param, with_enum=False) for param in ep.params]
+                }
+                for ep in api.endpoints
+            ]
+        }
+    
+    def _api_schema(self, api: APIConfig) -> Dict[str, Any]:
+        """get_api_schema response for a whole API."""
+        return {
+            "api_name": api.name,
+            "base_url": api.base_url,
+            "description": api.description,
+            "auth_type": api.auth.type if api.auth else "none",
+            "global_headers": api.headers,
+            "endpoints": [
+                {
+                    "name": ep.name,
+                    "method": ep.method,
+                    "path": ep.path,
+                    "description": ep.description,
+                    "parameters": [self._param_schema(param) for param in ep.params]
                 }
+                for ep in api.endpoints
+            ]
+        }
+    
+    def _endpoint_schema(self, api: APIConfig, endpoint: APIEndpoint) -> Dict[str, Any]:
+        """get_api_schema response for a single endpoint."""
+        return {
+            "api_name": api.name,
+            "endpoint_name": endpoint.name,
+            "method": endpoint.method,
+            "path": endpoint.path,
+            "description": endpoint.description,
+            "parameters": [self._param_schema(param) for param in endpoint.params],
+            "headers": endpoint.headers,
+            "timeout": endpoint.timeout
+        }
+    
+    def _rebuild_list_cache(self, api_name: Optional[str] = None):
+        """Re-serialize the list_apis entry of one API, or of all APIs when api_name is None."""
+        if api_name is None:
+            self._list_entries = {}
+            names = list(self.apis)
+        else:
+            names = [api_name]
+        for name in names:
+            api = self.apis.get(name)
+            if api is None:
+                self._list_entries.pop(name, None)
+            else:
+                self._list_entries[name] = orjson.dumps(name) + b":" + orjson.dumps(self._api_summary(api))
+    
+    def _rebuild_schema_cache(self, api_name: str):
+        """Re-serialize the schema responses of one API (dropping them if it is gone)."""
+        api = self.apis.get(api_name)
+        if api is None:
+            self._schema_cache.pop(api_name, None)
+            self._endpoint_schema_cache.pop(api_name, None)
+            return
+        self._schema_cache[api_name] = orjson.dumps(self._api_schema(api))
+        self._endpoint_schema_cache[api_name] = {
+            ep.name: orjson.dumps(self._endpoint_schema(api, ep)) for ep in api.endpoints
+        }
     
-    async def _create_http_client(self, api_config: APIConfig) -> httpx.AsyncClient:
-        """Create an HTTP client with authentication configured."""
+    def _create_auth_context(self, api_config: APIConfig) -> AuthContext:
+        """Resolve base URL, headers and authentication for an API."""
         headers = {}
-        auth = None
+        params = {}
         
         # Add global headers
         if api_config.headers:
@@ -402,23 +474,28 @@ class APIWeaver:
             elif auth_config.type == "api_key":
                 if auth_config.api_key_header and auth_config.api_key:
                     headers[auth_config.api_key_header] = auth_config.api_key
+                if auth_config.api_key_param:
+                    params[auth_config.api_key_param] = auth_config.api_key
             
             elif auth_config.type == "basic" and auth_config.username and auth_config.password:
-                auth = httpx.BasicAuth(auth_config.username, auth_config.password)
+                credentials = f"{auth_config.username}:{auth_config.password}".encode()
+                headers["Authorization"] = f"Basic {base64.b64encode(credentials).decode('ascii')}"
             
             elif auth_config.type == "custom" and auth_config.custom_headers:
                 headers.update(auth_config.custom_headers)
         
-        # Create client
-        client = httpx.AsyncClient(
+        # Pre-merge endpoint headers so calls do not re-merge them per request
+        endpoint_headers = {
+            ep.name: {**headers, **ep.headers} if ep.headers else headers
+            for ep in api_config.endpoints
+        }
+        
+        return AuthContext(
             base_url=api_config.base_url,
             headers=headers,
-            auth=auth,
-            timeout=30.0,
-            follow_redirects=True
+            params=params,
+            endpoint_headers=endpoint_headers
         )
-        
-        return client
     
     def _generate_param_collection_code(self, endpoint: APIEndpoint) -> str:
         """Generate code to collect parameters explicitly."""
@@ -525,30 +602,21 @@ Parameters:
         if not api_config:
             raise ValueError(f"API '{api_name}' not found")
         
-        endpoint = None
-        for ep in api_config.endpoints:
-            if ep.name == endpoint_name:
-                endpoint = ep
-                break
-        
+        endpoint = api_config.get_endpoint(endpoint_name)
         if not endpoint:
             raise ValueError(f"Endpoint '{endpoint_name}' not found in API '{api_name}'")
         
-        # Get HTTP client
-        client = self.http_clients.get(api_name)
-        if not client:
-            raise ValueError(f"No HTTP client found for API '{api_name}'")
+        # Get request state
+        auth_ctx = self.auth_contexts.get(api_name)
+        if not auth_ctx:
+            raise ValueError(f"No auth context found for API '{api_name}'")
         
-        # Build request
+        # Build request; API, auth and endpoint headers were merged at registration
         url_path = endpoint.path
         query_params = {}
-        headers = {}
+        header_params = {}
         json_body = None
         
-        # Add endpoint-specific headers
-        if endpoint.headers:
-            headers.update(endpoint.headers)
-        
         # Process parameters
         for param in endpoint.params:
             value = params.get(param.name)
@@ -571,24 +639,27 @@ Parameters:
             elif param.location == "query":
                 query_params[param.name] = value
             elif param.location == "header":
-                headers[param.name] = str(value)
+                header_params[param.name] = str(value)
             elif param.location == "body":
                 if json_body is None:
                     json_body = {}
                 json_body[param.name] = value
         
         # Handle API key in query params
-        if api_config.auth and api_config.auth.type == "api_key" and api_config.auth.api_key_param:
-            query_params[api_config.auth.api_key_param] = api_config.auth.api_key
+        query_params.update(auth_ctx.params)
+        
+        headers = auth_ctx.endpoint_headers.get(endpoint.name, auth_ctx.headers)
+        if header_params:
+            headers = {**headers, **header_params}
         
         # Make request
         try:
             if ctx:
                 await ctx.info(f"Calling {endpoint.method} {url_path}")
             
-            response = await client.request(
+            response = await self._get_http_client().request(
                 method=endpoint.method,
-                url=url_path,
+                url=auth_ctx.url_for(url_path),
                 params=query_params if query_params else None,
                 headers=headers if headers else None,
                 json=json_body,
@@ -604,7 +675,7 @@ Parameters:
             else:
                 return response.text
                 
-        except httpx.HTTPStatusError as e:
+        except HTTPStatusError as e:
             error_msg = f"HTTP {e.response.status_code}: {e.response.text}"
             if ctx:
                 await ctx.error(error_msg)
@@ -616,4 +687,11 @@ Parameters:
     
     def run(self, **kwargs):
         """Run the MCP server."""
-        return self.mcp.run(**kwargs)
+        return asyncio.run(self.run_async(**kwargs))
+    
+    async def run_async(self, **kwargs):
+        """Run the MCP server on the current event loop, closing the owned HTTP transport on exit."""
+        try:
+            await self.mcp.run_async(**kwargs)
+        finally:
+            await self.aclose()
@@ -13,84 +13,257 @@ Data layout (example):
 }
 
 This module provides async-safe read/write helpers and helpers scoped by server name.
+The file is parsed once, on first use; all reads and mutations work on the in-memory copy. Each
+mutation is appended to a write-ahead log (<path>.wal, one JSON record per line),
+and a background task periodically compacts the log into a fresh snapshot, so a
+single change costs O(change) bytes on disk instead of a full rewrite.
+The snapshot is written compactly unless the store is created with pretty=True.
+
+File I/O runs directly on the event loop: the files are small and page-cache
+writes are cheaper than a thread hop. With durable=True the log is opened with
+O_DSYNC and snapshots are fsynced; those blocking calls go to a worker thread.
 """
-from typing import Any, Dict, List
-import json
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+import os
 from pathlib import Path
 import asyncio
 
+import orjson
+
 class JsonStore:
-    def __init__(self, path: str = "apis.json"):
+    def __init__(
+        self,
+        path: str = "apis.json",
+        compact_interval: float = 5.0,
+        compact_ops: int = 1000,
+        pretty: bool = False,
+        durable: bool = False,
+    ):
         self.path = Path(path)
-        self._lock = asyncio.Lock()
-        # Ensure file exists and is valid
-        if not self.path.exists():
-            self.path.write_text(json.dumps({}, ensure_ascii=False, indent=2))
+        self.wal_path = self.path.with_suffix(self.path.suffix + ".wal")
+        self._dump_option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if pretty else 0)
+        self._durable = durable
+        # Mutations of different servers never wait on each other; only the
+        # file writes themselves are serialized.
+        self._locks: Dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+        self._file_lock = asyncio.Lock()
+        self._load_lock = asyncio.Lock()
+        self._compact_interval = compact_interval
+        self._compact_ops = compact_ops
+        self._wal_fd: Optional[int] = None
+        self._wal_ops = 0
+        # Unlike locks, events bind to the loop that first waits on them, so they
+        # are created by start() together with the compactor task.
+        self._dirty: Optional[asyncio.Event] = None
+        self._compact_now: Optional[asyncio.Event] = None
+        self._flusher: Optional[asyncio.Task] = None
+        # Loaded lazily so constructing the store (often at import time) does no I/O
+        self._data: Optional[Dict[str, Dict[str, Any]]] = None
+
+    async def _ensure_file(self):
+        """Create an empty store file unless it exists; safe against concurrent starters."""
+        if self.path.exists():
+            return
+        try:
+            fd = os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+        except FileExistsError:
+            return
+        try:
+            os.write(fd, b"{}")
+        finally:
+            os.close(fd)
+
+    async def _ensure_loaded(self) -> Dict[str, Dict[str, Any]]:
+        if self._data is None:
+            async with self._load_lock:
+                if self._data is None:
+                    self._data = await self._read_file()
+                    if self._wal_ops:
+                        # Fold records left by a previous run into the next snapshot
+                        self._mark_dirty()
+        return self._data
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        """Read the snapshot and replay the write-ahead log on top of it."""
+        with self.path.open("rb") as f:
+            try:
+                data = orjson.loads(f.read())
+            except orjson.JSONDecodeError:
+                data = {}
+        # Ensure top-level is dict
+        if not isinstance(data, dict):
+            data = {}
+        if self.wal_path.exists():
+            for line in self.wal_path.read_bytes().splitlines():
+                try:
+                    record = orjson.loads(line)
+                except orjson.JSONDecodeError:
+                    continue  # torn tail from an interrupted append
+                self._apply(data, record)
+                self._wal_ops += 1
+        return data
+
+    @staticmethod
+    def _apply(data: Dict[str, Any], record: Dict[str, Any]):
+        op, server_name, api_name, config = record["t"], record["s"], record.get("n"), record.get("c")
+        if op == "add":
+            data.setdefault(server_name, {})[api_name] = config
+        elif op == "remove":
+            data.get(server_name, {}).pop(api_name, None)
+        elif op == "save":
+            data[server_name] = config
 
     async def _read_file(self) -> Dict[str, Any]:
-        def _read():
-            with self.path.open("r", encoding="utf-8") as f:
+        await self._ensure_file()
+        return self._load()
+
+    def _encode(self, data: Dict[str, Any]) -> bytes:
+        return orjson.dumps(data, option=self._dump_option)
+
+    def _open_wal(self) -> int:
+        if self._wal_fd is None:
+            flags = os.O_WRONLY | os.O_CREAT | os.O_APPEND
+            if self._durable:
+                flags |= getattr(os, "O_DSYNC", 0)
+            self._wal_fd = os.open(self.wal_path, flags, 0o644)
+        return self._wal_fd
+
+    async def _append(self, op: str, server_name: str, api_name: Optional[str] = None, config: Any = None):
+        """Log one mutation that has already been applied in memory."""
+        record = orjson.dumps(
+            {"t": op, "s": server_name, "n": api_name, "c": config},
+            option=orjson.OPT_NON_STR_KEYS,
+        ) + b"\n"
+        if self._durable:
+            async with self._file_lock:
+                await asyncio.to_thread(os.write, self._open_wal(), record)
+        else:
+            # Non-durable compaction never awaits, so it cannot interleave with this write
+            os.write(self._open_wal(), record)
+        self._wal_ops += 1
+        self._mark_dirty()
+        if self._wal_ops >= self._compact_ops:
+            self._compact_now.set()
+
+    def _replace_snapshot(self, payload: bytes):
+        """Atomically replace the snapshot (write, rename), then empty the log."""
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        with tmp.open("wb") as f:
+            f.write(payload)
+            if self._durable:
+                f.flush()
+                os.fsync(f.fileno())
+        tmp.replace(self.path)
+        if self._wal_fd is not None:
+            os.ftruncate(self._wal_fd, 0)
+        elif self.wal_path.exists():
+            os.truncate(self.wal_path, 0)
+
+    def start(self):
+        """Start the background compactor. Must be called from a running event loop."""
+        loop = asyncio.get_running_loop()
+        if self._flusher is not None and not self._flusher.done() and self._flusher.get_loop() is loop:
+            return
+        # A new compactor (possibly on a new loop, e.g. another app lifespan) gets
+        # fresh events; pending changes carry over.
+        dirty = self._dirty is not None and self._dirty.is_set()
+        self._dirty = asyncio.Event()
+        self._compact_now = asyncio.Event()
+        if dirty:
+            self._dirty.set()
+        self._flusher = loop.create_task(self._flush_loop())
+
+    def _mark_dirty(self):
+        self.start()
+        self._dirty.set()
+
+    async def _flush_loop(self):
+        while True:
+            await self._dirty.wait()
+            # Compact after compact_interval seconds, or sooner once compact_ops records piled up
+            try:
+                await asyncio.wait_for(self._compact_now.wait(), timeout=self._compact_interval)
+            except TimeoutError:
+                pass
+            self._compact_now.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"[store] failed to compact {self.path}: {e}")
+
+    async def flush(self):
+        """Compact the write-ahead log into a fresh snapshot now."""
+        if self._data is None or self._dirty is None or not self._dirty.is_set():
+            return
+        # Encoding is synchronous, so it sees a consistent snapshot without a deep
+        # copy. In durable mode the fsync runs in a worker thread; holding the file
+        # lock until the log is truncated makes appends issued meanwhile land in
+        # the emptied log (replaying them is idempotent).
+        async with self._file_lock:
+            self._dirty.clear()
+            self._wal_ops = 0
+            payload = self._encode(self._data)
+            if self._durable:
+                await asyncio.to_thread(self._replace_snapshot, payload)
+            else:
+                self._replace_snapshot(payload)
+
+    async def aclose(self):
+        """Stop the background compactor, compact pending changes and close the log."""
+        flusher, self._flusher = self._flusher, None
+        try:
+            # A compactor left on a previous (closed) loop cannot be awaited here
+            if flusher is not None and flusher.get_loop() is asyncio.get_running_loop():
+                flusher.cancel()
                 try:
-                    return json.load(f)
-                except json.JSONDecodeError:
-                    return {}
-        return await asyncio.to_thread(_read)
-
-    async def _write_file(self, data: Dict[str, Any]):
-        def _write():
-            tmp = self.path.with_suffix(self.path.suffix + ".tmp")
-            with tmp.open("w", encoding="utf-8") as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-            tmp.replace(self.path)
-        await asyncio.to_thread(_write)
+                    await flusher
+                except asyncio.CancelledError:
+                    pass
+        finally:
+            try:
+                await self.flush()
+            finally:
+                if self._wal_fd is not None:
+                    os.close(self._wal_fd)
+                    self._wal_fd = None
 
     async def load_all_servers(self) -> Dict[str, Dict[str, Any]]:
         """Return the full mapping: server_name -> (api_name -> config)."""
-        async with self._lock:
-            data = await self._read_file()
-            # Ensure top-level is dict
-            if not isinstance(data, dict):
-                data = {}
-            return data
+        return dict(await self._ensure_loaded())
 
     async def load_server(self, server_name: str) -> Dict[str, Any]:
         """Return all apis config for a specific server (may be empty)."""
-        async with self._lock:
-            data = await self._read_file()
-            return data.get(server_name, {})
+        data = await self._ensure_loaded()
+        async with self._locks[server_name]:
+            return dict(data.get(server_name, {}))
 
     async def save_server(self, server_name: str, apis: Dict[str, Any]):
         """Overwrite the apis for a specific server."""
-        async with self._lock:
-            data = await self._read_file()
+        data = await self._ensure_loaded()
+        async with self._locks[server_name]:
             data[server_name] = apis
-            await self._write_file(data)
+            await self._append("save", server_name, config=apis)
 
     async def add_api(self, server_name: str, api_name: str, config: Dict[str, Any]):
         """Add or replace an API config under server_name."""
-        async with self._lock:
-            data = await self._read_file()
-            server = data.get(server_name, {})
-            server[api_name] = config
-            data[server_name] = server
-            await self._write_file(data)
+        data = await self._ensure_loaded()
+        async with self._locks[server_name]:
+            data.setdefault(server_name, {})[api_name] = config
+            await self._append("add", server_name, api_name, config)
 
     async def remove_api(self, server_name: str, api_name: str):
-        async with self._lock:
-            data = await self._read_file()
+        data = await self._ensure_loaded()
+        async with self._locks[server_name]:
             server = data.get(server_name, {})
             if api_name in server:
                 del server[api_name]
-                data[server_name] = server
-                await self._write_file(data)
+                await self._append("remove", server_name, api_name)
 
     async def list_servers(self) -> List[str]:
-        async with self._lock:
-            data = await self._read_file()
-            return list(data.keys())
+        return list((await self._ensure_loaded()).keys())
 
     async def list_names(self, server_name: str) -> List[str]:
-        async with self._lock:
-            data = await self._read_file()
-            server = data.get(server_name, {})
-            return list(server.keys())
+        data = await self._ensure_loaded()
+        async with self._locks[server_name]:
+            return list(data.get(server_name, {}).keys())
@@ -0,0 +1,199 @@
+"""
+Outbound HTTP transports for APIWeaver.
+
+APIWeaver only needs a small subset of an HTTP client (request/head/get/post and
+close). Both backends implement that subset and return a TransportResponse, so
+the server code does not depend on the client library in use.
+
+The backend is chosen with the APIWEAVER_HTTP_BACKEND environment variable
+("aiohttp" or "httpx"). aiohttp is the default and has noticeably better latency
+under many concurrent requests; httpx is used when aiohttp is not installed.
+"""
+
+import os
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+import orjson
+
+try:
+    import aiohttp
+except ImportError:  # optional backend
+    aiohttp = None
+
+
+class HTTPStatusError(Exception):
+    """Raised by TransportResponse.raise_for_status for 4xx/5xx responses."""
+
+    def __init__(self, response: "TransportResponse"):
+        super().__init__(f"HTTP {response.status_code}")
+        self.response = response
+
+
+@dataclass
+class TransportResponse:
+    """Fully-read HTTP response. Header names are lower-cased."""
+    status_code: int
+    headers: Dict[str, str] = field(default_factory=dict)
+    content: bytes = b""
+    encoding: str = "utf-8"
+
+    @property
+    def text(self) -> str:
+        return self.content.decode(self.encoding, errors="replace")
+
+    def json(self) -> Any:
+        return orjson.loads(self.content)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise HTTPStatusError(self)
+
+
+def _merge_headers(items) -> Dict[str, str]:
+    """Lower-case header names and join repeated headers with ', '."""
+    headers: Dict[str, str] = {}
+    for key, value in items:
+        key = key.lower()
+        headers[key] = f"{headers[key]}, {value}" if key in headers else value
+    return headers
+
+
+def _query_items(params: Dict[str, Any]) -> List[Tuple[str, str]]:
+    """Encode query params the way httpx does (lists repeat, booleans lower-case, None empty)."""
+    items = []
+    for key, value in params.items():
+        values = value if isinstance(value, (list, tuple)) else [value]
+        for v in values:
+            if v is None:
+                v = ""
+            elif isinstance(v, bool):
+                v = "true" if v else "false"
+            items.append((key, str(v)))
+    return items
+
+
+class HttpxTransport:
+    """Transport backed by a pooled httpx.AsyncClient."""
+
+    def __init__(self, client: Optional[httpx.AsyncClient] = None, timeout: float = 30.0):
+        self._client = client or httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=200, max_keepalive_connections=100, keepalive_expiry=30),
+            http2=True,
+            timeout=httpx.Timeout(timeout),
+            follow_redirects=True,
+        )
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        json: Any = None,
+        timeout: Optional[float] = None,
+    ) -> TransportResponse:
+        response = await self._client.request(
+            method,
+            url,
+            params=params,
+            headers=headers,
+            json=json,
+            timeout=timeout if timeout is not None else httpx.USE_CLIENT_DEFAULT,
+        )
+        return TransportResponse(
+            status_code=response.status_code,
+            headers=dict(response.headers),
+            content=response.content,
+            encoding=response.encoding or "utf-8",
+        )
+
+    async def head(self, url: str, **kwargs) -> TransportResponse:
+        return await self.request("HEAD", url, **kwargs)
+
+    async def get(self, url: str, **kwargs) -> TransportResponse:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> TransportResponse:
+        return await self.request("POST", url, **kwargs)
+
+    async def aclose(self):
+        await self._client.aclose()
+
+
+class AiohttpTransport:
+    """Transport backed by a pooled aiohttp.ClientSession."""
+
+    def __init__(self, timeout: float = 30.0):
+        if aiohttp is None:
+            raise RuntimeError("aiohttp is not installed")
+        self._timeout = aiohttp.ClientTimeout(total=timeout)
+        # The session binds to the running loop, so it is created on first use.
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    def _get_session(self) -> "aiohttp.ClientSession":
+        if self._session is None:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=200, limit_per_host=50, keepalive_timeout=30, ttl_dns_cache=300
+                ),
+                timeout=self._timeout,
+                json_serialize=lambda obj: orjson.dumps(obj).decode("utf-8"),
+            )
+        return self._session
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        json: Any = None,
+        timeout: Optional[float] = None,
+    ) -> TransportResponse:
+        async with self._get_session().request(
+            method,
+            url,
+            params=_query_items(params) if params else None,
+            headers=headers,
+            json=json,
+            timeout=aiohttp.ClientTimeout(total=timeout) if timeout is not None else self._timeout,
+            allow_redirects=True,
+        ) as response:
+            content = await response.read()
+            return TransportResponse(
+                status_code=response.status,
+                headers=_merge_headers(response.headers.items()),
+                content=content,
+                encoding=response.charset or "utf-8",
+            )
+
+    async def head(self, url: str, **kwargs) -> TransportResponse:
+        return await self.request("HEAD", url, **kwargs)
+
+    async def get(self, url: str, **kwargs) -> TransportResponse:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> TransportResponse:
+        return await self.request("POST", url, **kwargs)
+
+    async def aclose(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+
+Transport = HttpxTransport | AiohttpTransport
+
+
+def create_transport(backend: Optional[str] = None, timeout: float = 30.0) -> Transport:
+    """Create the configured transport, falling back to httpx without aiohttp."""
+    backend = (backend or os.environ.get("APIWEAVER_HTTP_BACKEND", "aiohttp")).lower()
+    if backend == "aiohttp" and aiohttp is not None:
+        return AiohttpTransport(timeout=timeout)
+    if backend not in ("aiohttp", "httpx"):
+        raise ValueError(f"Unknown HTTP backend '{backend}'")
+    return HttpxTransport(timeout=timeout)
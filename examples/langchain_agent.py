@@ -4,7 +4,7 @@ LangChain agent that uses OpenAI as the LLM and calls APIWeaver admin HTTP endpo
 Usage:
   - Ensure APIWeaver MCP server and admin HTTP server are running (see docs).
   - Set OPENAI_API_KEY in environment.
-  - pip install -r requirements (langchain, openai, httpx)
+  - pip install -r requirements (langchain, openai, httpx[http2], orjson; optionally uvloop)
   - python examples/langchain_agent.py
 
 This script defines several tools that wrap admin HTTP endpoints:
@@ -15,220 +15,375 @@ This script defines several tools that wrap admin HTTP endpoints:
 - unregister_api
 - test_api_connection
 
-Tools expect a JSON string input describing parameters (see examples below).
+Tools declare Pydantic argument schemas (LangChain StructuredTool), so the model
+passes structured arguments instead of a JSON string.
+
+Tools are async (LangChain `coroutine=`), so run the agent with `arun` to let tool
+calls overlap; a blocking fallback is provided for `run`.
 """
+import asyncio
+import contextlib
+import functools
 import os
-import json
-from typing import Any, Dict
+import sys
+import time
+import weakref
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
 import httpx
+import orjson
+from pydantic import BaseModel, Field
+
+try:
+    import uvloop
+except ImportError:  # optional: faster event loop on Linux/macOS
+    uvloop = None
 
 # LangChain imports (version compatibility note below)
 from langchain.llms import OpenAI
-from langchain.agents import initialize_agent, Tool
+from langchain.agents import initialize_agent
 from langchain.agents import AgentType
+from langchain.tools import StructuredTool
 
 # Config: where admin HTTP server is listening
 ADMIN_BASE = os.environ.get("APIWEAVER_ADMIN_URL", "http://127.0.0.1:9000")
 DEFAULT_SERVER = os.environ.get("APIWEAVER_DEFAULT_SERVER", "server_alpha")
+# Seconds to reuse list/schema responses; agents repeat these lookups within one chain. 0 disables.
+CACHE_TTL = float(os.environ.get("APIWEAVER_CACHE_TTL", "5.0"))
+# Compact tool output costs the LLM fewer tokens; set APIWEAVER_COMPACT=0 for indented output when debugging.
+COMPACT = os.environ.get("APIWEAVER_COMPACT", "1") == "1"
+
+_loads = orjson.loads
+
+
+def _dumps(obj: Any, pretty: bool = False) -> str:
+    option = orjson.OPT_NON_STR_KEYS
+    if pretty or not COMPACT:
+        option |= orjson.OPT_INDENT_2
+    return orjson.dumps(obj, option=option).decode()
+
+
+# One AsyncClient per event loop: a connection pool cannot be shared across
+# loops, and the blocking fallback runs each call on its own loop.
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+
+
+def _client() -> httpx.AsyncClient:
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None:
+        client = httpx.AsyncClient(
+            base_url=ADMIN_BASE,
+            timeout=httpx.Timeout(connect=2.0, read=30.0, write=10.0, pool=5.0),
+            http2=True,
+            limits=httpx.Limits(max_keepalive_connections=32, max_connections=64, keepalive_expiry=60.0),
+            headers={"Accept": "application/json"},
+        )
+        _clients[loop] = client
+    return client
+
+
+async def aclose_client():
+    """Close the current event loop's client; await this before the loop exits."""
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+def _run(coro):
+    """asyncio.run on a uvloop loop when available."""
+    if uvloop is not None and sys.platform != "win32":
+        return asyncio.run(coro, loop_factory=uvloop.new_event_loop)
+    return asyncio.run(coro)
+
+
+def _sync(tool: Callable[..., Awaitable[str]]) -> Callable[..., str]:
+    """Blocking fallback for agents driven with `run` instead of `arun`."""
+    async def _once(**kwargs: Any) -> str:
+        try:
+            return await tool(**kwargs)
+        finally:
+            await aclose_client()
+
+    def run(**kwargs: Any) -> str:
+        return _run(_once(**kwargs))
+    return run
+
+
+# Admin routes; formatted paths are memoized since the set of servers/APIs is small
+_PATHS = {
+    "register": "/admin/{}/register",
+    "unregister": "/admin/{}/unregister",
+    "list": "/admin/{}/list",
+    "test": "/admin/{}/test",
+    "call": "/admin/{}/call",
+    "schema": "/admin/{}/schema/{}",
+}
 
-client = httpx.Client(timeout=30.0)
+
+@functools.lru_cache(maxsize=64)
+def _path(route: str, *args: str) -> str:
+    return _PATHS[route].format(*args)
+
+
+# (route, server) -> when the admin answered with an unmatched-route 404; such routes
+# are skipped for ROUTE_CAP_TTL seconds, after which an upgraded admin is noticed.
+_missing_routes: Dict[Tuple[str, str], float] = {}
+ROUTE_CAP_TTL = 60.0
+
+
+def _route_missing(route: str, server: str) -> bool:
+    seen = _missing_routes.get((route, server))
+    return seen is not None and time.monotonic() - seen < ROUTE_CAP_TTL
+
+
+# GET results keyed by (path, params); register/unregister change them, so those POSTs clear it.
+_get_cache: Dict[Any, Tuple[float, Any]] = {}
+_GET_CACHE_MAX = 256
+# Pass {NO_CACHE: True} in params to force a fresh GET
+NO_CACHE = "_nocache"
 
 
 # ---------- Helper HTTP wrappers ----------
-def _post(path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
-    url = f"{ADMIN_BASE}{path}"
-    resp = client.post(url, json=payload)
-    try:
-        return {"status_code": resp.status_code, "body": resp.json()}
-    except Exception:
-        return {"status_code": resp.status_code, "text": resp.text}
+_JSON_CONTENT = {"content-type": "application/json"}
 
 
-def _get(path: str, params: Dict[str, Any] = None) -> Dict[str, Any]:
-    url = f"{ADMIN_BASE}{path}"
-    resp = client.get(url, params=params)
+def _result(resp: httpx.Response) -> Dict[str, Any]:
+    """Decode an admin reply from its bytes; the admin always answers in UTF-8, so skip charset sniffing."""
+    data = resp.content
     try:
-        return {"status_code": resp.status_code, "body": resp.json()}
-    except Exception:
-        return {"status_code": resp.status_code, "text": resp.text}
+        return {"status_code": resp.status_code, "body": _loads(data)}
+    except orjson.JSONDecodeError:
+        return {"status_code": resp.status_code, "text": data.decode("utf-8", "replace")}
+
+
+async def _post(path: str, payload: Dict[str, Any], mutating: bool = False) -> Dict[str, Any]:
+    # Encode once with orjson rather than letting httpx run stdlib json on json=
+    return await _post_body(path, orjson.dumps(payload), mutating)
+
+
+async def _post_body(path: str, body: bytes, mutating: bool = False) -> Dict[str, Any]:
+    """POST an already-encoded JSON body; mutating=True drops cached GET results."""
+    resp = await _client().post(path, content=body, headers=_JSON_CONTENT)
+    if mutating:
+        _get_cache.clear()
+    return _result(resp)
+
+
+def _splice_json(resp: httpx.Response) -> str:
+    """Render {"status_code", "body"} with the admin's JSON body spliced in unparsed."""
+    if resp.content and resp.headers.get("content-type", "").startswith("application/json"):
+        return (b'{"status_code":%d,"body":%b}' % (resp.status_code, resp.content)).decode()
+    return _dumps({"status_code": resp.status_code, "text": resp.content.decode("utf-8", "replace")})
+
+
+async def _get(path: str, params: Dict[str, Any] = None, raw: bool = False) -> Any:
+    """GET an admin route. With raw=True return the rendered tool output (see _splice_json)."""
+    params = dict(params) if params else {}
+    use_cache = CACHE_TTL > 0 and not params.pop(NO_CACHE, False)
+    key = (path, tuple(sorted(params.items())), raw)
+    now = time.monotonic()
+    if use_cache:
+        cached = _get_cache.get(key)
+        if cached and now - cached[0] < CACHE_TTL:
+            return cached[1]
+    resp = await _client().get(path, params=params or None)
+    if raw:
+        result = _splice_json(resp)
+    else:
+        result = _result(resp)
+    if use_cache:
+        if len(_get_cache) >= _GET_CACHE_MAX:
+            _get_cache.pop(next(iter(_get_cache)))
+        _get_cache[key] = (now, result)
+    return result
+
+
+async def warmup(timeout: float = 2.0):
+    """Open a pooled connection to the admin server so the first tool call skips the handshake."""
+    with contextlib.suppress(httpx.HTTPError):
+        await _client().get(_path("list", DEFAULT_SERVER), timeout=timeout)
+
+
+# ---------- Tool argument schemas ----------
+class RegisterArgs(BaseModel):
+    server: str = Field(DEFAULT_SERVER, description="APIWeaver server name")
+    config: Dict[str, Any] = Field(..., description="APIWeaver APIConfig dict")
+
+
+class ServerArgs(BaseModel):
+    server: str = Field(DEFAULT_SERVER, description="APIWeaver server name")
+
+
+class CallArgs(BaseModel):
+    server: str = Field(DEFAULT_SERVER, description="APIWeaver server name")
+    api_name: str = Field(..., description="Registered API name, e.g. 'weather'")
+    endpoint_name: str = Field(..., description="Endpoint name, e.g. 'get_current_weather'")
+    parameters: Dict[str, Any] = Field(default_factory=dict, description="Endpoint parameters")
+
+
+class SchemaArgs(BaseModel):
+    server: str = Field(DEFAULT_SERVER, description="APIWeaver server name")
+    api_name: Optional[str] = Field(None, description="API to describe; omit to list the server's APIs")
+    endpoint: Optional[str] = Field(None, description="Restrict the schema to one endpoint")
+    verbose: bool = Field(False, description="Indent the output")
+
+
+class ApiArgs(BaseModel):
+    server: str = Field(DEFAULT_SERVER, description="APIWeaver server name")
+    api_name: str = Field(..., description="Registered API name")
 
 
 # ---------- Tool implementations ----------
-def tool_register_api(input_str: str) -> str:
-    """
-    Input: JSON string like:
-    {
-      "server": "server_alpha",         # optional, default uses DEFAULT_SERVER
-      "config": { ... API config ... }  # APIWeaver APIConfig dict
-    }
-    """
-    try:
-        payload = json.loads(input_str)
-    except Exception as e:
-        return f"Invalid JSON input: {e}"
+# call_api is the hot path: splice the encoded fields into the body instead of building a dict
+_CALL_BODY = b'{"api_name":%b,"endpoint_name":%b,"parameters":%b}'
+_NO_CALL_ROUTE = "admin call endpoint not found. Please implement /admin/{server}/call or use call_api tool via MCP."
 
-    server = payload.get("server", DEFAULT_SERVER)
-    config = payload.get("config")
-    if not config:
-        return "Missing 'config' in payload"
-    res = _post(f"/admin/{server}/register", {"config": config})
-    return json.dumps(res, indent=2, ensure_ascii=False)
 
+async def tool_register_api(config: Dict[str, Any], server: str = DEFAULT_SERVER) -> str:
+    res = await _post(_path("register", server), {"config": config}, mutating=True)
+    return _dumps(res)
 
-def tool_list_apis(input_str: str) -> str:
-    """
-    Input: server name (string) or empty -> uses DEFAULT_SERVER
-    Example: "server_alpha"
-    """
-    server = input_str.strip() or DEFAULT_SERVER
-    res = _get(f"/admin/{server}/list")
-    return json.dumps(res, indent=2, ensure_ascii=False)
+
+async def tool_list_apis(server: str = DEFAULT_SERVER) -> str:
+    res = await _get(_path("list", server or DEFAULT_SERVER))
+    return _dumps(res)
 
 
-def tool_call_api(input_str: str) -> str:
+async def tool_call_api(
+    api_name: str,
+    endpoint_name: str,
+    parameters: Optional[Dict[str, Any]] = None,
+    server: str = DEFAULT_SERVER,
+) -> str:
     """
-    Input JSON string:
-    {
-      "server": "server_alpha",         # optional
-      "api_name": "weather",
-      "endpoint_name": "get_current_weather",
-      "parameters": { "q": "London", "units": "metric" }
-    }
-    This tool uses admin HTTP call_api route via /admin/{server}/... -> we map to admin test/call endpoints (we defined call via /admin/{server}/call? If not present, use call_api tool endpoint we added earlier)
+    Call an endpoint through the admin's /admin/{server}/call route. If the admin does not
+    implement it, return test/schema diagnostics for the API instead; while that miss is
+    remembered (ROUTE_CAP_TTL), later calls get the error alone without touching the admin.
     """
+    if _route_missing("call", server):
+        # Already diagnosed on the first miss; answer without another round trip
+        return _dumps({"error": _NO_CALL_ROUTE})
+    call_path = _path("call", server)
+    body = _CALL_BODY % (orjson.dumps(api_name), orjson.dumps(endpoint_name), orjson.dumps(parameters or {}))
     try:
-        payload = json.loads(input_str)
-    except Exception as e:
-        return f"Invalid JSON input: {e}"
-
-    server = payload.get("server", DEFAULT_SERVER)
-    api_name = payload.get("api_name")
-    endpoint_name = payload.get("endpoint_name")
-    parameters = payload.get("parameters", {})
-
-    if not api_name or not endpoint_name:
-        return "Missing 'api_name' or 'endpoint_name'"
-
-    # Our admin_http doesn't expose a direct /call route; we can call the MCP generic call_api tool
-    # via the admin if we had such route; in our admin_http we created call-like capabilities via call_api tool originally;
-    # For simplicity, use the admin tool call_api via POST /admin/{server}/call (if you implemented it),
-    # Otherwise, use the admin HTTP to contact the API's base directly via the call_api generic route we implemented as MCP tool
-    # We'll attempt /admin/{server}/call first, fallback to using the /admin/{server}/test path to show connectivity.
-    call_path = f"/admin/{server}/call"
-    payload_call = {"api_name": api_name, "endpoint_name": endpoint_name, "parameters": parameters}
-    try:
-        resp = client.post(ADMIN_BASE + call_path, json=payload_call)
-        if resp.status_code == 404:
-            # fallback: call the MCP 'call_api' via admin isn't available; return instruction for user
-            return json.dumps({"error": "admin call endpoint not found. Please implement /admin/{server}/call or use call_api tool via MCP."}, indent=2, ensure_ascii=False)
-        try:
-            return json.dumps({"status_code": resp.status_code, "body": resp.json()}, indent=2, ensure_ascii=False)
-        except Exception:
-            return json.dumps({"status_code": resp.status_code, "text": resp.text}, indent=2, ensure_ascii=False)
+        res = await _post_body(call_path, body)
+        if res["status_code"] == 404:
+            # FastAPI's body for a route it has no handler for (vs. e.g. an unknown API)
+            if res.get("body") == {"detail": "Not Found"}:
+                _missing_routes[("call", server)] = time.monotonic()
+            # fallback: call the MCP 'call_api' via admin isn't available; probe the API and its
+            # endpoint schema concurrently so the agent gets the diagnostics in one round trip;
+            # a failed probe is reported in its own slot rather than failing the other
+            test, schema = await asyncio.gather(
+                _post(_path("test", server), {"api_name": api_name}),
+                _get(_path("schema", server, api_name), params={"endpoint": endpoint_name}),
+                return_exceptions=True,
+            )
+            return _dumps({
+                "error": _NO_CALL_ROUTE,
+                "test": str(test) if isinstance(test, Exception) else test,
+                "schema": str(schema) if isinstance(schema, Exception) else schema,
+            })
+        return _dumps(res)
     except Exception as e:
         return f"HTTP request failed: {e}"
 
 
-def tool_get_api_schema(input_str: str) -> str:
-    """
-    Input JSON or plain text:
-    - Plain server name: returns all apis
-    - JSON: {"server":"server_alpha", "api_name":"weather", "endpoint":"get_current_weather"}
-    """
-    try:
-        payload = json.loads(input_str)
-        server = payload.get("server", DEFAULT_SERVER)
-        api_name = payload.get("api_name")
-        endpoint = payload.get("endpoint")
-    except Exception:
-        # treat as plain server or api name
-        parts = input_str.strip().split()
-        if len(parts) == 0 or parts[0] == "":
-            server = DEFAULT_SERVER
-            api_name = None
-            endpoint = None
-        elif len(parts) == 1:
-            server = parts[0]
-            api_name = None
-            endpoint = None
-        else:
-            server = parts[0]
-            api_name = parts[1]
-            endpoint = parts[2] if len(parts) > 2 else None
-
+async def tool_get_api_schema(
+    server: str = DEFAULT_SERVER,
+    api_name: Optional[str] = None,
+    endpoint: Optional[str] = None,
+    verbose: bool = False,
+) -> str:
+    """Schema for one API (optionally one endpoint), or the server's API list without api_name."""
     if api_name:
-        path = f"/admin/{server}/schema/{api_name}"
+        path = _path("schema", server, api_name)
         params = {"endpoint": endpoint} if endpoint else None
     else:
         # return list for server
-        path = f"/admin/{server}/list"
+        path = _path("list", server)
         params = None
 
-    res = _get(path, params=params)
-    return json.dumps(res, indent=2, ensure_ascii=False)
+    if verbose:
+        return _dumps(await _get(path, params=params), pretty=True)
+    # Schema dumps can be large: hand the body to the LLM without a parse/re-dump round trip
+    return await _get(path, params=params, raw=True)
 
 
-def tool_unregister_api(input_str: str) -> str:
-    """
-    Input JSON: {"server":"server_alpha", "api_name":"weather"}
-    """
-    try:
-        payload = json.loads(input_str)
-    except Exception as e:
-        return f"Invalid JSON input: {e}"
-    server = payload.get("server", DEFAULT_SERVER)
-    api_name = payload.get("api_name")
-    if not api_name:
-        return "Missing 'api_name'"
-    res = _post(f"/admin/{server}/unregister", {"api_name": api_name})
-    return json.dumps(res, indent=2, ensure_ascii=False)
+async def tool_unregister_api(api_name: str, server: str = DEFAULT_SERVER) -> str:
+    res = await _post(_path("unregister", server), {"api_name": api_name}, mutating=True)
+    return _dumps(res)
 
 
-def tool_test_api_connection(input_str: str) -> str:
-    """
-    Input JSON: {"server":"server_alpha", "api_name":"weather"}
-    """
-    try:
-        payload = json.loads(input_str)
-    except Exception as e:
-        return f"Invalid JSON input: {e}"
-    server = payload.get("server", DEFAULT_SERVER)
-    api_name = payload.get("api_name")
-    if not api_name:
-        return "Missing 'api_name'"
-    res = _post(f"/admin/{server}/test", {"api_name": api_name})
-    return json.dumps(res, indent=2, ensure_ascii=False)
+async def tool_test_api_connection(api_name: str, server: str = DEFAULT_SERVER) -> str:
+    res = await _post(_path("test", server), {"api_name": api_name})
+    return _dumps(res)
 
 
 # ---------- Build LangChain tools ----------
+def _tool(name: str, coroutine: Callable[..., Awaitable[str]], args_schema: type, description: str) -> StructuredTool:
+    return StructuredTool.from_function(
+        func=_sync(coroutine),
+        coroutine=coroutine,
+        name=name,
+        description=description,
+        args_schema=args_schema,
+    )
+
+
 tools = [
-    Tool(name="register_api", func=tool_register_api, description="Register an API. Input is JSON with 'server' and 'config'."),
-    Tool(name="list_apis", func=tool_list_apis, description="List APIs registered on a server. Input is server name or empty."),
-    Tool(name="call_api", func=tool_call_api, description="Call a registered API endpoint. Input JSON with server, api_name, endpoint_name, parameters."),
-    Tool(name="get_api_schema", func=tool_get_api_schema, description="Get schema for an API or list APIs. Input JSON or plain text."),
-    Tool(name="unregister_api", func=tool_unregister_api, description="Unregister an API. Input JSON with server and api_name."),
-    Tool(name="test_api_connection", func=tool_test_api_connection, description="Test connectivity for a registered API. Input JSON with server and api_name."),
+    _tool("register_api", tool_register_api, RegisterArgs, "Register an API config on a server."),
+    _tool("list_apis", tool_list_apis, ServerArgs, "List APIs registered on a server."),
+    _tool("call_api", tool_call_api, CallArgs, "Call an endpoint of a registered API with the given parameters."),
+    _tool("get_api_schema", tool_get_api_schema, SchemaArgs, "Get the schema of an API or endpoint, or list a server's APIs."),
+    _tool("unregister_api", tool_unregister_api, ApiArgs, "Unregister an API from a server."),
+    _tool("test_api_connection", tool_test_api_connection, ApiArgs, "Test connectivity for a registered API."),
 ]
 
 # ---------- Create LLM and Agent ----------
+@functools.lru_cache(maxsize=1)
+def _llm():
+    return OpenAI(temperature=0)
+
+
+@functools.lru_cache(maxsize=1)
 def build_agent():
+    """Build the agent once; later calls (e.g. from a batch harness) reuse it."""
     api_key = os.environ.get("OPENAI_API_KEY")
     if not api_key:
         raise EnvironmentError("OPENAI_API_KEY not set in environment")
-    llm = OpenAI(temperature=0)
     agent = initialize_agent(
         tools,
-        llm,
-        agent=AgentType.ZERO_SHOT_REACT_DESCRIPTION,
+        _llm(),
+        # Structured chat: the zero-shot ReAct agent only supports single-string tools
+        agent=AgentType.STRUCTURED_CHAT_ZERO_SHOT_REACT_DESCRIPTION,
         verbose=True
     )
     return agent
 
 
+async def run_batch(agent, prompts: List[str], concurrency: int = 8) -> List[str]:
+    """Run independent prompts concurrently, at most `concurrency` at a time; results keep prompt order."""
+    sem = asyncio.Semaphore(concurrency)
+
+    async def _one(prompt: str) -> str:
+        async with sem:
+            return await agent.arun(prompt)
+
+    return await asyncio.gather(*(_one(p) for p in prompts))
+
+
 # ---------- Example usage ----------
-def example_register_and_call():
+async def example_register_and_call():
     agent = build_agent()
+    try:
+        await warmup()
+        await _example_steps(agent)
+    finally:
+        await aclose_client()
+
 
+async def _example_steps(agent):
     # 1) Register an API (example payload)
     register_payload = {
         "server": "server_alpha",
@@ -256,11 +411,17 @@ def example_register_and_call():
         }
     }
     print("=== Register API ===")
-    print(agent.run(f"register_api: {json.dumps(register_payload)}"))
+    print(await agent.arun(f"register_api: {orjson.dumps(register_payload).decode()}"))
 
-    # 2) List apis
+    # 2) List apis and fetch the new API's schema; both only read, so run them together
+    listing, schema = await run_batch(agent, [
+        "list_apis: server_alpha",
+        f"get_api_schema: {orjson.dumps({'server': 'server_alpha', 'api_name': 'weather'}).decode()}",
+    ])
     print("=== List APIs ===")
-    print(agent.run("list_apis: server_alpha"))
+    print(listing)
+    print("=== API Schema ===")
+    print(schema)
 
     # 3) Call the endpoint (if your admin supports /admin/{server}/call)
     call_payload = {
@@ -270,9 +431,9 @@ def example_register_and_call():
         "parameters": {"q": "London"}
     }
     print("=== Call API ===")
-    print(agent.run(f"call_api: {json.dumps(call_payload)}"))
+    print(await agent.arun(f"call_api: {orjson.dumps(call_payload).decode()}"))
 
 
 if __name__ == "__main__":
     # Run example
-    example_register_and_call()
+    _run(example_register_and_call())
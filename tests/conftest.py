@@ -0,0 +1,42 @@
+"""Shared fixtures for the APIWeaver test suite."""
+
+import pytest
+
+from apiweaver import admin_http
+from apiweaver.storage import JsonStore
+
+
+@pytest.fixture
+def api_config_dict():
+    """A config exercising every nested model: auth, endpoints and params."""
+    return {
+        "name": "weather",
+        "base_url": "https://api.example.com/v1",
+        "description": "Example weather API",
+        "auth": {"type": "api_key", "api_key": "secret", "api_key_param": "appid"},
+        "headers": {"Accept": "application/json"},
+        "endpoints": [
+            {
+                "name": "current",
+                "description": "Current weather for a city",
+                "method": "GET",
+                "path": "/weather/{city}",
+                "params": [
+                    {"name": "city", "location": "path", "required": True},
+                    {"name": "units", "enum": ["metric", "imperial"], "default": "metric"},
+                ],
+                "headers": {"X-Trace": "1"},
+            }
+        ],
+    }
+
+
+@pytest.fixture
+def admin(tmp_path, monkeypatch):
+    """The admin module with a fresh store in tmp_path and no weavers."""
+    monkeypatch.setattr(admin_http, "store", JsonStore(str(tmp_path / "apis.json")))
+    monkeypatch.setattr(admin_http, "weavers", {})
+    admin_http._resolve.cache_clear()
+    admin_http._probe_cache.clear()
+    yield admin_http
+    admin_http._resolve.cache_clear()
@@ -0,0 +1,105 @@
+"""Tests for config validation, trusted reloads, lookups and routes of the admin interface."""
+
+import orjson
+import pytest
+from fastapi.routing import APIRoute
+from fastapi.testclient import TestClient
+from fastmcp import Client
+from pydantic import ValidationError
+
+from apiweaver.models import APIConfig, APIEndpoint, AuthConfig, RequestParam
+from apiweaver.storage import JsonStore
+
+
+async def test_trusted_entry_is_rebuilt_after_restart(admin, api_config_dict, tmp_path):
+    api_config = APIConfig(**api_config_dict)
+    await admin.store.add_api("s1", "weather", {**api_config.as_dict(), admin._TRUSTED_KEY: True})
+    await admin.store.aclose()
+
+    stored = (await JsonStore(str(tmp_path / "apis.json")).load_server("s1"))["weather"]
+    rebuilt = admin._parse_config(stored, trusted=True)
+
+    assert rebuilt.model_dump() == api_config.model_dump()
+    assert isinstance(rebuilt.auth, AuthConfig)
+    endpoint = rebuilt.get_endpoint("current")
+    assert isinstance(endpoint, APIEndpoint)
+    assert all(isinstance(param, RequestParam) for param in endpoint.params)
+    assert endpoint.params[1].enum == ["metric", "imperial"]
+
+
+def test_untrusted_parse_ignores_trusted_marker(admin, api_config_dict):
+    del api_config_dict["endpoints"][0]["description"]
+    with pytest.raises(ValidationError):
+        admin._parse_config({**api_config_dict, admin._TRUSTED_KEY: True})
+
+
+def test_register_validates_forged_trusted_marker(admin, api_config_dict):
+    del api_config_dict["endpoints"][0]["description"]
+    with TestClient(admin.app) as client:
+        resp = client.post(
+            "/admin/s1/register",
+            json={"config": {**api_config_dict, admin._TRUSTED_KEY: True}},
+        )
+    assert resp.status_code == 400
+    assert "s1" not in admin.weavers
+    assert orjson.loads(admin.store.path.read_bytes()) == {}
+
+
+
+def test_lookup_follows_changes_made_through_mcp_tools(admin):
+    config = {"name": "demo", "base_url": "http://127.0.0.1:9", "endpoints": []}
+    with TestClient(admin.app) as client:
+        assert client.post("/admin/s1/register", json={"config": config}).status_code == 200
+        assert client.get("/admin/s1/schema/demo").status_code == 200
+
+        async def unregister_via_mcp():
+            async with Client(admin.weavers["s1"].mcp) as mcp:
+                await mcp.call_tool("unregister_api", {"api_name": "demo"})
+
+        client.portal.call(unregister_via_mcp)
+
+        assert client.get("/admin/s1/schema/demo").status_code == 404
+        assert client.post("/admin/s1/unregister", json={"api_name": "demo"}).status_code == 404
+    assert orjson.loads(admin.store.path.read_bytes()) == {"s1": {}}
+
+
+def test_weavers_use_the_current_lifespans_transport(admin):
+    config = {"name": "demo", "base_url": "http://127.0.0.1:9", "endpoints": []}
+    with TestClient(admin.app) as client:
+        assert client.post("/admin/s1/register", json={"config": config}).status_code == 200
+        first = admin.app.state.http
+    with TestClient(admin.app) as client:
+        assert admin.app.state.http is not first
+        assert admin.weavers["s1"].http_client is admin.app.state.http
+        assert client.get("/admin/s1/schema/demo").status_code == 200
+
+
+def test_failed_register_keeps_the_stored_entry(admin, api_config_dict, monkeypatch):
+    stale = {**api_config_dict, "endpoints": [{"name": "current", "path": "/weather"}]}
+    admin.store.path.write_bytes(orjson.dumps({"s1": {"weather": stale}}))
+
+    async def fail(*args, **kwargs):
+        raise RuntimeError("tool creation failed")
+
+    monkeypatch.setattr(admin.APIWeaver, "_create_endpoint_tool", fail)
+    with TestClient(admin.app) as client:
+        resp = client.post("/admin/s1/register", json={"config": api_config_dict})
+        assert resp.status_code == 500
+        assert client.get("/admin/s1/schema/weather").status_code == 404
+    assert orjson.loads(admin.store.path.read_bytes()) == {"s1": {"weather": stale}}
+
+
+def test_admin_routes_match_the_documented_surface(admin):
+    routes = {
+        (method, route.path)
+        for route in admin.app.routes
+        if isinstance(route, APIRoute)
+        for method in route.methods
+    }
+    assert routes == {
+        ("POST", "/admin/{server_name}/register"),
+        ("POST", "/admin/{server_name}/unregister"),
+        ("GET", "/admin/{server_name}/list"),
+        ("POST", "/admin/{server_name}/test"),
+        ("GET", "/admin/{server_name}/schema/{api_name}"),
+    }
@@ -0,0 +1,92 @@
+"""Tests for the JSON store's write-ahead log and compaction."""
+
+import asyncio
+import os
+
+import orjson
+
+from apiweaver.storage import JsonStore
+
+
+def _crash(store: JsonStore):
+    """Drop a store without compacting, as if the process died."""
+    if store._flusher is not None:
+        store._flusher.cancel()
+    if store._wal_fd is not None:
+        os.close(store._wal_fd)
+        store._wal_fd = None
+
+
+async def test_wal_replay_restores_uncompacted_changes(tmp_path):
+    path = tmp_path / "apis.json"
+    store = JsonStore(str(path), compact_interval=60)
+    await store.add_api("s1", "a", {"v": 1})
+    await store.add_api("s1", "b", {"v": 2})
+    await store.remove_api("s1", "a")
+    await store.save_server("s2", {"c": {"v": 3}})
+    _crash(store)
+
+    assert orjson.loads(path.read_bytes()) == {}
+    reopened = JsonStore(str(path), compact_interval=60)
+    assert await reopened.load_all_servers() == {"s1": {"b": {"v": 2}}, "s2": {"c": {"v": 3}}}
+    await reopened.aclose()
+
+
+async def test_wal_replay_skips_torn_last_line(tmp_path):
+    path = tmp_path / "apis.json"
+    store = JsonStore(str(path), compact_interval=60)
+    await store.add_api("s1", "a", {"v": 1})
+    _crash(store)
+    with open(store.wal_path, "ab") as f:
+        f.write(b'{"t":"add","s":"s1","n":"b","c":{"v"')
+
+    reopened = JsonStore(str(path), compact_interval=60)
+    assert await reopened.load_server("s1") == {"a": {"v": 1}}
+    await reopened.aclose()
+
+
+async def test_compaction_writes_snapshot_and_truncates_log(tmp_path):
+    path = tmp_path / "apis.json"
+    store = JsonStore(str(path), compact_interval=60)
+    await store.add_api("s1", "a", {"v": 1})
+    await store.add_api("s1", "b", {"v": 2})
+    assert store.wal_path.stat().st_size > 0
+
+    await store.flush()
+    assert store.wal_path.stat().st_size == 0
+    assert orjson.loads(path.read_bytes()) == {"s1": {"a": {"v": 1}, "b": {"v": 2}}}
+
+    # Appends after compaction land in the emptied log
+    await store.remove_api("s1", "a")
+    await store.aclose()
+    assert store.wal_path.stat().st_size == 0
+    assert orjson.loads(path.read_bytes()) == {"s1": {"b": {"v": 2}}}
+
+
+async def test_compactor_runs_after_compact_ops_records(tmp_path):
+    store = JsonStore(str(tmp_path / "apis.json"), compact_interval=60, compact_ops=3)
+    for i in range(3):
+        await store.add_api("s1", f"a{i}", {"v": i})
+    for _ in range(50):
+        if store.wal_path.stat().st_size == 0:
+            break
+        await asyncio.sleep(0.01)
+    assert store.wal_path.stat().st_size == 0
+    await store.aclose()
+
+
+def test_store_survives_a_new_event_loop(tmp_path):
+    path = tmp_path / "apis.json"
+    store = JsonStore(str(path), compact_interval=0.01)
+
+    async def add(name):
+        store.start()
+        await store.add_api("s1", name, {})
+        await asyncio.sleep(0.1)
+
+    asyncio.run(add("a"))
+    asyncio.run(add("b"))
+    assert orjson.loads(path.read_bytes()) == {"s1": {"a": {}, "b": {}}}
+
+    asyncio.run(store.aclose())
+    assert store._wal_fd is None
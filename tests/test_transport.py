@@ -0,0 +1,31 @@
+"""The aiohttp backend's helpers must encode requests and decode headers like httpx."""
+
+import httpx
+import pytest
+
+from apiweaver.transport import _merge_headers, _query_items
+
+
+@pytest.mark.parametrize(
+    "params",
+    [
+        {"q": "London", "units": "metric"},
+        {"page": 2, "ratio": 1.5, "text": "a b&c=d"},
+        {"flag": True, "other": False},
+        {"ids": [1, 2, 3], "tags": ("x", "y")},
+        {"missing": None, "mixed": [1, None, True]},
+        {},
+    ],
+)
+def test_query_items_match_httpx(params):
+    assert _query_items(params) == httpx.QueryParams(params).multi_items()
+
+
+def test_merge_headers_matches_httpx():
+    raw = [
+        ("Content-Type", "application/json"),
+        ("Set-Cookie", "a=1"),
+        ("set-cookie", "b=2"),
+        ("X-Request-Id", "abc"),
+    ]
+    assert _merge_headers(raw) == dict(httpx.Headers(raw))